@@ -1,5 +1,32 @@
 import appdaemon.plugins.hass.hassapi as hass
-from datetime import datetime, time
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+
+# Fan handling when a room empties, keyed by fan_triggered_by:
+# (check environment before turning off, turn-off log message formatted with room/source)
+FAN_POLICY = {
+    'manual': (False, "🔧 MANUAL FAN - Turning off fan in {room} because room is now empty"),
+    'humidity': (True, "🌡️ AUTOMATIC FAN - Environmental conditions normalized, turning off fan in {room}"),
+    'temperature': (True, "🌡️ AUTOMATIC FAN - Environmental conditions normalized, turning off fan in {room}"),
+}
+FAN_POLICY_UNKNOWN = (False, "⚠️ UNKNOWN FAN TRIGGER - Turning off fan in {room} (unknown source: {source})")
+
+# Per-entity log messages for set_room_entities(), keyed by (kind, target state)
+ENTITY_SWITCH_LOG = {
+    ("light", "on"): "Turned ON light",
+    ("light", "off"): "Turned OFF light",
+    ("fan", "on"): "💨 Turned ON fan",
+    ("fan", "off"): "🔇 Turned OFF fan",
+}
+
+# Static log message prefixes for the environmental fan paths
+LOG_SHOWER_DETECTED = "🚿 SHOWER DETECTED! "
+LOG_HUMIDITY_NORMALIZED = "💨 HUMIDITY NORMALIZED! Fan auto-shutoff in "
+LOG_TEMPERATURE_NORMALIZED = "🌡️ TEMPERATURE NORMALIZED! Fan auto-shutoff in "
+LOG_HUMIDITY_ELEVATED = "🌡️ Humidity elevated "
+LOG_TEMPERATURE_ELEVATED = "🌡️ Temperature elevated "
+LOG_NO_ENV_JUSTIFICATION = "🔧 No environmental justification - treating as MANUAL activation"
 
 class RoomOccupancyManager(hass.Hass):
     """
@@ -22,6 +49,34 @@ class RoomOccupancyManager(hass.Hass):
     def initialize(self):
         """Initialize the room occupancy manager with all room configurations."""
         self.rooms = self.args.get("rooms", {})
+        self._debug = self.args.get("debug", False)  # Per-event chatter logs only when enabled
+
+        # Pending light/fan service calls, flushed together shortly after the first is queued
+        self._svc_queue = defaultdict(set)
+        self._svc_handle = None
+
+        # room_name -> handle of the coalesced occupancy-detected callback (motion/presence/door bursts)
+        self._pending_occupancy = {}
+
+        # timer_entity -> last known state, kept current by timer_state_changed
+        self._timer_states = {}
+
+        # light_override entity -> True while ON, kept current by light_override_changed
+        self._override_state = {}
+
+        # Pending humidity/temperature callbacks: (room_name, sensor_type) -> (timer handle, latest reading)
+        self._debounce = {}
+
+        # Last known state of every controlled light/fan, kept warm by state listeners
+        self._state_cache = {}
+
+        # Sunrise/sunset as seconds since midnight for the current date (recomputed when the date rolls over)
+        self._sun_cache_date = None
+        self._sun_cache = None
+
+        # Last is_night_time() result, reused for a short window during motion bursts
+        self._night_ttl_until = 0.0
+        self._night_val = False
 
         if not self.rooms:
             self.log("No rooms configured. Exiting initialization.", level="ERROR")
@@ -29,28 +84,79 @@ class RoomOccupancyManager(hass.Hass):
 
         self.log(f"Initializing RoomOccupancyManager for {len(self.rooms)} rooms")
 
+        # One snapshot of all entity states for setup instead of a get_state() per sensor
+        self._all_states = self.get_state() or {}
+
         for room_name, room_config in self.rooms.items():
             self.setup_room(room_name, room_config)
 
+        self._all_states = {}  # Release the snapshot - runtime state comes from listeners
+
+    def initial_state(self, entity):
+        """Return an entity's state from the setup snapshot (None if unknown)."""
+        return self._all_states.get(entity, {}).get("state")
+
     def setup_room(self, room_name, room_config):
         """Set up listeners and initialize state for a single room."""
         try:
             # Initialize room state tracking
+            room_config['_name'] = room_name  # Lets helpers that take room_config name the room in logs
             room_config['occupancy_active'] = False
             room_config['last_humidity'] = None
             room_config['last_temperature'] = None
             room_config['previous_temperature'] = None  # NEW: For rate-of-change detection
-            room_config['temperature_timestamps'] = []  # NEW: Track temperature change timing
+            room_config['temperature_timestamps'] = deque(maxlen=5)  # NEW: Track temperature change timing (monotonic seconds, last 5 readings)
             room_config['fan_active'] = False
             room_config['fan_triggered_by'] = None  # NEW: Track what triggered the fan (humidity/temperature/manual)
+            room_config['_light_override'] = room_config.get("light_override")  # Its state is mirrored in self._override_state
+            room_config['_active_sensors'] = set()  # Occupancy sensors (presence/motion/door) currently ON
+
+            # Controlled entity lists as immutable tuples, duplicates dropped (order kept) - used by validation and all setup below
+            room_config['_lights'] = tuple(dict.fromkeys(room_config.get("lights", [])))
+            room_config['_fans'] = tuple(dict.fromkeys(room_config.get("fans", [])))
 
             # Validate configuration
             if not self.validate_room_config(room_name, room_config):
                 return
 
-            self.log(f"Setting up room: {room_name}")
-
-            # Set up sensor listeners
+            # Precompute environmental thresholds (static per room, read on every sensor update)
+            humidity_threshold = room_config.get('humidity_threshold', 5.0)
+            room_config['_hum_th'] = humidity_threshold
+            room_config['_hum_th_50'] = humidity_threshold * 0.5  # Baseline drift limit
+            room_config['_hum_th_70'] = humidity_threshold * 0.7  # "Decreasing" notice
+            room_config['_hum_th_80'] = humidity_threshold * 0.8  # Keep fan on while empty
+            temp_threshold = room_config.get('temperature_threshold', 3.0)
+            room_config['_temp_th'] = temp_threshold
+            room_config['_temp_th_30'] = temp_threshold * 0.3  # Baseline drift limit
+            room_config['_temp_th_50'] = temp_threshold * 0.5  # Keep fan on while empty
+            room_config['_temp_th_80'] = temp_threshold * 0.8  # "Decreasing" notice
+
+            # Cache static room config read on the event paths
+            behavior = room_config.get("behavior", "normal")
+            room_config['_behavior'] = behavior
+            room_config['_timer'] = room_config.get("timer_entity")
+            room_config['_debounce_seconds'] = room_config.get('debounce_seconds', 10)
+            room_config['_is_bathroom'] = 'bathroom' in room_name.lower() or behavior == "bathroom"
+            room_config['_has_presence'] = bool(room_config.get("presence_sensors", []))
+
+            # Controlled entities flattened to (entity, kind) pairs so lights and fans are switched in one pass
+            room_config['_entities'] = (
+                tuple((light, "light") for light in room_config['_lights'])
+                + tuple((fan, "fan") for fan in room_config['_fans'])
+            )
+
+            # All occupancy sensors in one tuple (presence first - most accurate), used to seed _active_sensors
+            room_config['_occupancy_entities'] = tuple(
+                room_config.get("presence_sensors", [])
+                + room_config.get("motion_sensors", [])
+                + room_config.get("doors", [])
+            )
+            room_config['_active_sensors'] = {
+                entity for entity in room_config['_occupancy_entities'] if self.initial_state(entity) == "on"
+            }
+
+            # Set up sensor listeners (light/fan state cache first - startup fan checks may turn fans off)
+            self.setup_state_cache(room_name, room_config)
             self.setup_motion_sensors(room_name, room_config)
             self.setup_door_sensors(room_name, room_config)
             self.setup_presence_sensors(room_name, room_config)
@@ -58,57 +164,70 @@ class RoomOccupancyManager(hass.Hass):
             self.setup_temperature_sensors(room_name, room_config)
             self.setup_fan_listeners(room_name, room_config)  # NEW: Listen for manual fan activation
             self.setup_timer_listener(room_name, room_config)
+            self.setup_light_override_listener(room_name, room_config)
+
+            # One summary line per room instead of one per listener
+            listened = {
+                "motion": room_config.get("motion_sensors", []),
+                "presence": room_config.get("presence_sensors", []),
+                "doors": room_config.get("doors", []),
+                "humidity": room_config.get("humidity_sensors", []),
+                "temperature": room_config.get("temperature_sensors", []),
+                "fans": room_config['_fans'],
+                "timer": [room_config["timer_entity"]] if room_config.get("timer_entity") else [],
+                "override": [room_config["light_override"]] if room_config.get("light_override") else [],
+            }
+            summary = "; ".join(f"{kind}: {', '.join(entities)}" for kind, entities in listened.items() if entities)
+            self.log(f"Set up room {room_name} - {summary or 'no sensors configured'}")
 
         except Exception as e:
             self.log(f"Error setting up room {room_name}: {e}", level="ERROR")
 
     def validate_room_config(self, room_name, room_config):
         """Validate that room configuration has required elements."""
-        if not room_config.get('lights') and not room_config.get('fans'):
+        if not room_config['_lights'] and not room_config['_fans']:
             self.log(f"Room {room_name} has no lights or fans configured", level="WARNING")
 
+        # Missing controlled entities are reported once here rather than on every switch
+        for kind, entities in (("Light", room_config['_lights']), ("Fan", room_config['_fans'])):
+            for entity in entities:
+                if entity not in self._all_states:
+                    self.log(f"WARNING: {kind} entity {entity} not found in {room_name}", level="WARNING")
+
         return True
 
     def setup_motion_sensors(self, room_name, room_config):
         """Set up motion sensor listeners for a room."""
         motion_sensors = room_config.get("motion_sensors", [])
         for sensor in motion_sensors:
-            # Listen for motion ON (occupancy detected)
-            self.listen_state(self.motion_detected, sensor, new="on",
-                            room_name=room_name, sensor_type="motion")
-            # Listen for motion OFF (potentially clear occupancy)
-            self.listen_state(self.motion_cleared, sensor, new="off",
+            # Single listener - motion_state dispatches on ON/OFF
+            self.listen_state(self.motion_state, sensor, attribute="state",
                             room_name=room_name, sensor_type="motion")
-            self.log(f"Listening to motion sensor: {sensor}")
 
     def setup_door_sensors(self, room_name, room_config):
         """Set up door sensor listeners for a room."""
         doors = room_config.get("doors", [])
         for door in doors:
-            self.listen_state(self.door_state_changed, door,
+            self.listen_state(self.door_state_changed, door, attribute="state",
                             room_name=room_name, sensor_type="door")
-            self.log(f"Listening to door sensor: {door}")
 
     def setup_presence_sensors(self, room_name, room_config):
         """Set up presence sensor listeners for immediate occupancy detection."""
         presence_sensors = room_config.get("presence_sensors", [])
         for sensor in presence_sensors:
-            # Listen for both on and off states for immediate response
-            self.listen_state(self.presence_detected, sensor, new="on",
-                            room_name=room_name, sensor_type="presence")
-            self.listen_state(self.presence_cleared, sensor, new="off",
+            # Single listener for both on and off states - presence_state dispatches
+            self.listen_state(self.presence_state, sensor, attribute="state",
                             room_name=room_name, sensor_type="presence")
-            self.log(f"Listening to presence sensor: {sensor}")
 
     def setup_humidity_sensors(self, room_name, room_config):
         """Set up humidity sensor listeners for bathroom fan control."""
         humidity_sensors = room_config.get("humidity_sensors", [])
         for sensor in humidity_sensors:
-            self.listen_state(self.humidity_changed, sensor,
+            self.listen_state(self.humidity_changed, sensor, attribute="state",
                             room_name=room_name, sensor_type="humidity")
             # Initialize baseline humidity
             try:
-                current_humidity = float(self.get_state(sensor))
+                current_humidity = float(self.initial_state(sensor))
                 room_config['baseline_humidity'] = current_humidity
                 room_config['last_humidity'] = current_humidity
                 self.log(f"Baseline humidity for {room_name}: {current_humidity}%")
@@ -121,36 +240,34 @@ class RoomOccupancyManager(hass.Hass):
         """Set up temperature sensor listeners for bathroom fan control."""
         temperature_sensors = room_config.get("temperature_sensors", [])
         for sensor in temperature_sensors:
-            self.listen_state(self.temperature_changed, sensor,
+            self.listen_state(self.temperature_changed, sensor, attribute="state",
                             room_name=room_name, sensor_type="temperature")
             # Initialize baseline temperature
             try:
-                current_temp = float(self.get_state(sensor))
+                current_temp = float(self.initial_state(sensor))
                 room_config['baseline_temperature'] = current_temp
                 room_config['last_temperature'] = current_temp
                 room_config['previous_temperature'] = current_temp
-                room_config['temperature_timestamps'] = [datetime.now()]
+                room_config['temperature_timestamps'] = deque([time.monotonic()], maxlen=5)
                 self.log(f"Baseline temperature for {room_name}: {current_temp}°")
             except (ValueError, TypeError):
                 self.log(f"Could not get initial temperature for {sensor}", level="WARNING")
                 room_config['baseline_temperature'] = 20.0  # Default baseline
                 room_config['last_temperature'] = 20.0
                 room_config['previous_temperature'] = 20.0
-                room_config['temperature_timestamps'] = [datetime.now()]
+                room_config['temperature_timestamps'] = deque([time.monotonic()], maxlen=5)
 
     def setup_fan_listeners(self, room_name, room_config):
         """Set up fan state listeners to detect manual fan activation."""
-        fans = room_config.get("fans", [])
-        for fan in fans:
+        for fan in room_config['_fans']:
             # Listen for fan state changes to detect manual activation
-            self.listen_state(self.fan_state_changed, fan,
+            self.listen_state(self.fan_state_changed, fan, attribute="state",
                             room_name=room_name, fan_entity=fan)
-            self.log(f"Listening to fan state changes: {fan}")
 
             # Initialize fan state tracking
             # Initialize fan state tracking with environmental condition checking
             try:
-                current_fan_state = self.get_state(fan)
+                current_fan_state = self.initial_state(fan)
                 if current_fan_state == "on":
                     # Fan is already on at startup - check environmental conditions
                     self.log(f"Fan {fan} already ON at startup - checking environmental conditions")
@@ -161,22 +278,20 @@ class RoomOccupancyManager(hass.Hass):
                     if 'humidity_sensors' in room_config and room_config['humidity_sensors']:
                         current_humidity = room_config.get('last_humidity', 0)
                         baseline_humidity = room_config.get('baseline_humidity', 50.0)
-                        humidity_threshold = room_config.get('humidity_threshold', 5.0)
                         humidity_increase = current_humidity - baseline_humidity
                         
-                        if humidity_increase >= humidity_threshold:
-                            self.log(f"🌡️ Humidity elevated ({humidity_increase:.1f}%) - treating as AUTOMATIC trigger")
+                        if humidity_increase >= room_config['_hum_th']:
+                            self.log(f"{LOG_HUMIDITY_ELEVATED}({humidity_increase:.1f}%) - treating as AUTOMATIC trigger")
                             fan_trigger = 'humidity'
                     
                     # Check if temperature conditions justify automatic trigger
                     if not fan_trigger and 'temperature_sensors' in room_config and room_config['temperature_sensors']:
                         current_temp = room_config.get('last_temperature', 20.0)
                         baseline_temp = room_config.get('baseline_temperature', 20.0)
-                        temp_threshold = room_config.get('temperature_threshold', 3.0)
                         temp_increase = current_temp - baseline_temp
                         
-                        if temp_increase >= temp_threshold:
-                            self.log(f"🌡️ Temperature elevated ({temp_increase:.1f}°F) - treating as AUTOMATIC trigger")
+                        if temp_increase >= room_config['_temp_th']:
+                            self.log(f"{LOG_TEMPERATURE_ELEVATED}({temp_increase:.1f}°F) - treating as AUTOMATIC trigger")
                             fan_trigger = 'temperature'
                     
                     # Set trigger source
@@ -186,13 +301,13 @@ class RoomOccupancyManager(hass.Hass):
                         room_config['fan_triggered_by'] = fan_trigger
                     else:
                         # No environmental justification - assume manual
-                        self.log(f"🔧 No environmental justification - treating as MANUAL activation")
+                        self.log(LOG_NO_ENV_JUSTIFICATION)
                         room_config['fan_active'] = True
                         room_config['fan_triggered_by'] = 'manual'
                         
                         # If room is empty and fan is manual, turn it off immediately
                         # (User left room with fan on, then AppDaemon restarted)
-                        if not self.is_room_occupied(room_name):
+                        if not self.is_room_occupied(room_config):
                             self.log(f"🔧 Room {room_name} is empty with manual fan - turning off fan")
                             self.turn_off_fans(room_config)
                             room_config['fan_active'] = False
@@ -202,117 +317,214 @@ class RoomOccupancyManager(hass.Hass):
 
     def setup_timer_listener(self, room_name, room_config):
         """Set up timer state listener for a room."""
-        timer_entity = room_config.get("timer_entity")
+        timer_entity = room_config['_timer']
         if timer_entity:
-            self.listen_state(self.timer_finished, timer_entity, new="idle",
+            # Single listener - timer_state_changed caches the state and dispatches on idle
+            self.listen_state(self.timer_state_changed, timer_entity, attribute="state",
                             room_name=room_name)
-            self.log(f"Listening to timer: {timer_entity}")
-
-    def is_bathroom(self, room_name):
+            self._timer_states[timer_entity] = self.initial_state(timer_entity)
+
+    def setup_light_override_listener(self, room_name, room_config):
+        """Track the light override input boolean so occupancy handlers don't have to poll it."""
+        light_override = room_config['_light_override']
+        if light_override and light_override not in self._override_state:  # One listener per entity, even if shared
+            self.listen_state(self.light_override_changed, light_override, attribute="state")
+            self._override_state[light_override] = self.initial_state(light_override) == "on"
+
+    def setup_state_cache(self, room_name, room_config):
+        """Cache light/fan states so turn on/off decisions don't call get_state() per entity."""
+        for fan in room_config['_fans']:
+            # Kept current by fan_state_changed - no extra listener needed
+            self._state_cache.setdefault(fan, self.initial_state(fan))
+
+        for light in room_config['_lights']:
+            if light in self._state_cache:
+                continue  # Shared with another room (or also a fan) - already tracked
+            self._state_cache[light] = self.initial_state(light)
+            self.listen_state(self._on_state_change, light, attribute="state")
+
+    def _on_state_change(self, entity, attribute, old, new, kwargs):
+        """Keep the light state cache current."""
+        self._state_cache[entity] = new
+
+    def light_override_changed(self, entity, attribute, old, new, kwargs):
+        """Cache the light override state."""
+        self._override_state[entity] = new == "on"
+
+    def is_light_override_on(self, room_config):
+        """Check if the room's light override input boolean is ON."""
+        return self._override_state.get(room_config['_light_override'], False)
+
+    def is_bathroom(self, room_config):
         """Check if this is a bathroom room."""
-        room_config = self.rooms[room_name]
-        behavior = room_config.get("behavior", "normal")
-        return 'bathroom' in room_name.lower() or behavior == "bathroom"
+        return room_config['_is_bathroom']
 
-    def has_presence_sensors(self, room_name):
+    def has_presence_sensors(self, room_config):
         """Check if room has presence sensors configured."""
-        room_config = self.rooms[room_name]
-        return bool(room_config.get("presence_sensors", []))
+        return room_config['_has_presence']
+
+    def track_sensor_state(self, room_config, entity, new):
+        """Keep the room's set of ON occupancy sensors in sync (anything but ON counts as inactive)."""
+        active_sensors = room_config['_active_sensors']
+        if new == "on":
+            active_sensors.add(entity)
+        else:
+            active_sensors.discard(entity)
+
+    def motion_state(self, entity, attribute, old, new, kwargs):
+        """Dispatch motion sensor state changes to detected/cleared handlers."""
+        self.track_sensor_state(self.rooms[kwargs["room_name"]], entity, new)
+        if new == "on":
+            self.motion_detected(entity, attribute, old, new, kwargs)
+        elif new == "off":
+            self.motion_cleared(entity, attribute, old, new, kwargs)
 
     def motion_detected(self, entity, attribute, old, new, kwargs):
         """Handle motion detection in a room."""
-        room_name = kwargs["room_name"]
-        if self.is_bathroom(room_name):
-            self.log(f"Motion detected in {room_name} (bathroom) - updating occupancy state only, no automatic lights")
-        else:
-            self.log(f"Motion detected in {room_name} - normal light control")
-        self.handle_occupancy_detected(room_name)
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
+        if self._debug:
+            if self.is_bathroom(room_config):
+                self.log(f"Motion detected in {room_name} (bathroom) - updating occupancy state only, no automatic lights")
+            else:
+                self.log(f"Motion detected in {room_name} - normal light control")
+        self.queue_occupancy_detected(room_config)
 
     def motion_cleared(self, entity, attribute, old, new, kwargs):
         """Handle motion cleared - start timer ONLY when no other occupancy detected."""
-        room_name = kwargs["room_name"]
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
         self.log(f"Motion cleared in {room_name} - checking if room is still occupied")
 
         # Check if any other sensors still show occupancy
-        if not self.is_room_occupied(room_name):
+        if not self.is_room_occupied(room_config):
             self.log(f"No other occupancy detected in {room_name} - starting timer")
-            self.start_timer(room_name)
+            self.start_timer(room_config)
         else:
             self.log(f"Other occupancy still detected in {room_name} - not starting timer")
 
+    def presence_state(self, entity, attribute, old, new, kwargs):
+        """Dispatch presence sensor state changes to detected/cleared handlers."""
+        self.track_sensor_state(self.rooms[kwargs["room_name"]], entity, new)
+        if new == "on":
+            self.presence_detected(entity, attribute, old, new, kwargs)
+        elif new == "off":
+            self.presence_cleared(entity, attribute, old, new, kwargs)
+
     def presence_detected(self, entity, attribute, old, new, kwargs):
         """Handle presence detection."""
-        room_name = kwargs["room_name"]
-        if self.is_bathroom(room_name):
-            self.log(f"Presence detected in {room_name} (bathroom) - updating occupancy state only, no automatic lights")
-        else:
-            self.log(f"Presence detected in {room_name} - normal light control")
-        self.handle_occupancy_detected(room_name)
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
+        if self._debug:
+            if self.is_bathroom(room_config):
+                self.log(f"Presence detected in {room_name} (bathroom) - updating occupancy state only, no automatic lights")
+            else:
+                self.log(f"Presence detected in {room_name} - normal light control")
+        self.queue_occupancy_detected(room_config)
 
     def presence_cleared(self, entity, attribute, old, new, kwargs):
         """Handle presence cleared - immediate response."""
-        room_name = kwargs["room_name"]
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
         self.log(f"Presence cleared in {room_name} - immediate response")
-        self.handle_occupancy_cleared(room_name)
+        self.handle_occupancy_cleared(room_config)
 
     def door_state_changed(self, entity, attribute, old, new, kwargs):
         """Handle door state changes."""
-        room_name = kwargs["room_name"]
-        door_state = self.get_state(entity)
+        if new == old:  # Attribute-only republish
+            return
 
-        if door_state == "on":  # Door opened
-            if self.is_bathroom(room_name):
-                self.log(f"Door opened in {room_name} (bathroom) - updating occupancy state only")
-            else:
-                self.log(f"Door opened in {room_name} - normal light control")
-            self.handle_occupancy_detected(room_name)
-        elif door_state == "off":  # Door closed
-            self.log(f"Door closed in {room_name}")
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
+        self.track_sensor_state(room_config, entity, new)
+
+        if new == "on":  # Door opened
+            if self._debug:
+                if self.is_bathroom(room_config):
+                    self.log(f"Door opened in {room_name} (bathroom) - updating occupancy state only")
+                else:
+                    self.log(f"Door opened in {room_name} - normal light control")
+            self.queue_occupancy_detected(room_config)
+        elif new == "off":  # Door closed
+            if self._debug:
+                self.log(f"Door closed in {room_name}")
             # For rooms with presence sensors, check immediately if empty
-            if self.has_presence_sensors(room_name):
-                if not self.is_room_occupied(room_name):
-                    self.handle_occupancy_cleared(room_name)
+            if self.has_presence_sensors(room_config):
+                if not self.is_room_occupied(room_config):
+                    self.handle_occupancy_cleared(room_config)
+
+    def debounce_sensor(self, room_config, sensor_type, callback, new):
+        """Run callback at most once per window with the latest value; updates while pending only replace the value."""
+        room_name = room_config['_name']
+        key = (room_name, sensor_type)
+
+        # Never reschedule a pending callback - a sensor reporting faster than the window must still be processed
+        pending = self._debounce.get(key)
+        if pending is not None:
+            self._debounce[key] = (pending[0], new)
+        else:
+            handle = self.run_in(callback, room_config['_debounce_seconds'], room_name=room_name)
+            self._debounce[key] = (handle, new)
 
     def humidity_changed(self, entity, attribute, old, new, kwargs):
+        """Throttle humidity updates - the latest reading is processed once per window."""
+        if new == old:  # Attribute-only republish
+            return
+        self.debounce_sensor(self.rooms[kwargs["room_name"]], "humidity", self._do_humidity, new)
+
+    def temperature_changed(self, entity, attribute, old, new, kwargs):
+        """Throttle temperature updates - the latest reading is processed once per window."""
+        if new == old:  # Attribute-only republish
+            return
+        self.debounce_sensor(self.rooms[kwargs["room_name"]], "temperature", self._do_temperature, new)
+
+    def _do_humidity(self, kwargs):
         """Handle humidity changes for bathroom fan control with automatic shutoff."""
-        room_name = kwargs["room_name"]
-        room_config = self.rooms[room_name]
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
+        _, new = self._debounce.pop((room_name, 'humidity'))
 
         try:
             current_humidity = float(new)
             baseline_humidity = room_config.get('baseline_humidity', 50.0)
-            humidity_threshold = room_config.get('humidity_threshold', 5.0)
 
             # Calculate humidity change
             humidity_increase = current_humidity - baseline_humidity
 
+            # IDLE FAST PATH: empty room, no fan running and humidity near baseline - only drift the baseline
+            if not room_config['fan_active'] and not room_config['occupancy_active'] and abs(humidity_increase) < room_config['_hum_th_50']:
+                room_config['baseline_humidity'] = (baseline_humidity * 0.95) + (current_humidity * 0.05)
+                room_config['last_humidity'] = current_humidity
+                return
+
             # CRITICAL: NEVER override manual control - respect user's explicit fan activation
-            current_trigger = room_config.get('fan_triggered_by')
+            current_trigger = room_config['fan_triggered_by']
             if current_trigger == 'manual':
                 # User manually turned on fan - don't interfere with environmental triggers
-                self.log(f"Manual fan control active in {room_name} - ignoring humidity trigger")
+                if self._debug:
+                    self.log(f"Manual fan control active in {room_name} - ignoring humidity trigger")
                 return
 
             # Check for humidity spike (shower detection) - AUTOMATICALLY TURN ON FAN
-            if humidity_increase >= humidity_threshold and not room_config['fan_active'] and room_config.get('occupancy_active', False):
-                self.log(f"🚿 SHOWER DETECTED! Humidity spike in {room_name}: {humidity_increase:.1f}% increase - turning on fan automatically")
+            if humidity_increase >= room_config['_hum_th'] and not room_config['fan_active'] and room_config['occupancy_active']:
+                self.log(f"{LOG_SHOWER_DETECTED}Humidity spike in {room_name}: {humidity_increase:.1f}% increase - turning on fan automatically")
                 self.turn_on_fans(room_config)
                 room_config['fan_active'] = True
                 room_config['fan_triggered_by'] = 'humidity'
 
             # AUTOMATIC FAN SHUTOFF when humidity normalizes (only for automatically triggered fans)
-            elif room_config['fan_active'] and room_config.get('fan_triggered_by') == 'humidity':
+            elif room_config['fan_active'] and room_config['fan_triggered_by'] == 'humidity':
                 # Use centralized environmental check
-                if not self.should_keep_fan_on_when_empty(room_name, 'humidity'):
-                    self.log(f"💨 HUMIDITY NORMALIZED! Fan auto-shutoff in {room_name}: humidity dropped to {humidity_increase:.1f}% above baseline")
+                if not self.should_keep_fan_on_when_empty(room_config, 'humidity'):
+                    self.log(f"{LOG_HUMIDITY_NORMALIZED}{room_name}: humidity dropped to {humidity_increase:.1f}% above baseline")
                     self.turn_off_fans(room_config)
                     room_config['fan_active'] = False
                     room_config['fan_triggered_by'] = None
-                elif humidity_increase < humidity_threshold * 0.7:  # 70% of threshold
+                elif humidity_increase < room_config['_hum_th_70'] and self._debug:  # 70% of threshold
                     self.log(f"Humidity decreasing in {room_name} ({humidity_increase:.1f}% above baseline) - fan will auto-shutoff when normalized")
 
             # Update baseline gradually when no spike
-            elif humidity_increase < humidity_threshold * 0.5:
+            elif humidity_increase < room_config['_hum_th_50']:
                 # Slowly adjust baseline (moving average)
                 room_config['baseline_humidity'] = (baseline_humidity * 0.95) + (current_humidity * 0.05)
 
@@ -322,69 +534,76 @@ class RoomOccupancyManager(hass.Hass):
         except (ValueError, TypeError) as e:
             self.log(f"Error processing humidity change: {e}", level="WARNING")
 
-    def temperature_changed(self, entity, attribute, old, new, kwargs):
+    def _do_temperature(self, kwargs):
         """Handle temperature changes with RATE-OF-CHANGE detection and automatic fan shutoff."""
-        room_name = kwargs["room_name"]
-        room_config = self.rooms[room_name]
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
+        _, new = self._debounce.pop((room_name, 'temperature'))
 
         try:
             current_temp = float(new)
             baseline_temp = room_config.get('baseline_temperature', 20.0)
-            temp_threshold = room_config.get('temperature_threshold', 3.0)
             previous_temp = room_config.get('previous_temperature', current_temp)
 
             # Calculate temperature change
             temp_increase = current_temp - baseline_temp
             temp_change_rate = current_temp - previous_temp
 
+            # IDLE FAST PATH: empty room, no fan running and temperature near baseline - only record the reading
+            # (the baseline is left alone, as on the full path where the drift branch is never reached)
+            if not room_config['fan_active'] and not room_config['occupancy_active'] and abs(temp_increase) < room_config['_temp_th_30']:
+                room_config['temperature_timestamps'].append(time.monotonic())
+                room_config['previous_temperature'] = current_temp
+                room_config['last_temperature'] = current_temp
+                return
+
             # CRITICAL: NEVER override manual control - respect user's explicit fan activation
-            current_trigger = room_config.get('fan_triggered_by')
+            current_trigger = room_config['fan_triggered_by']
             if current_trigger == 'manual':
                 # User manually turned on fan - don't interfere with environmental triggers
-                self.log(f"Manual fan control active in {room_name} - ignoring temperature trigger")
+                if self._debug:
+                    self.log(f"Manual fan control active in {room_name} - ignoring temperature trigger")
                 return
 
             # RATE-OF-CHANGE DETECTION
-            now = datetime.now()
-            room_config['temperature_timestamps'].append(now)
-
-            # Keep only last 5 temperature readings (5 minutes max)
-            if len(room_config['temperature_timestamps']) > 5:
-                room_config['temperature_timestamps'] = room_config['temperature_timestamps'][-5:]
+            # Deque keeps only the last 5 temperature readings (5 minutes max)
+            now = time.monotonic()
+            timestamps = room_config['temperature_timestamps']
+            timestamps.append(now)
 
             # Calculate rate of change over time
-            if len(room_config['temperature_timestamps']) >= 2:
-                time_diff = (now - room_config['temperature_timestamps'][0]).total_seconds() / 60  # minutes
+            if len(timestamps) >= 2:
+                time_diff = (now - timestamps[0]) / 60  # minutes
                 if time_diff > 0:
                     temp_rate_per_min = temp_change_rate / time_diff
 
                     # SHOWER DETECTION: Rapid temperature rise (>1°F per minute) OR significant spike
                     rapid_rise = abs(temp_rate_per_min) > 1.0 and temp_change_rate > 0
-                    significant_spike = temp_increase >= temp_threshold
+                    significant_spike = temp_increase >= room_config['_temp_th']
 
-                    if (rapid_rise or significant_spike) and not room_config['fan_active'] and room_config.get('occupancy_active', False):
+                    if (rapid_rise or significant_spike) and not room_config['fan_active'] and room_config['occupancy_active']:
                         if rapid_rise:
-                            self.log(f"🚿 SHOWER DETECTED! Rapid temperature rise in {room_name}: {temp_rate_per_min:.1f}°F/min - turning on fan automatically")
+                            self.log(f"{LOG_SHOWER_DETECTED}Rapid temperature rise in {room_name}: {temp_rate_per_min:.1f}°F/min - turning on fan automatically")
                         else:
-                            self.log(f"🚿 SHOWER DETECTED! Temperature spike in {room_name}: {temp_increase:.1f}°F increase - turning on fan automatically")
+                            self.log(f"{LOG_SHOWER_DETECTED}Temperature spike in {room_name}: {temp_increase:.1f}°F increase - turning on fan automatically")
 
                         self.turn_on_fans(room_config)
                         room_config['fan_active'] = True
                         room_config['fan_triggered_by'] = 'temperature'
 
             # AUTOMATIC FAN SHUTOFF when temperature normalizes (only for automatically triggered fans)
-            elif room_config['fan_active'] and room_config.get('fan_triggered_by') == 'temperature':
+            elif room_config['fan_active'] and room_config['fan_triggered_by'] == 'temperature':
                 # Use centralized environmental check
-                if not self.should_keep_fan_on_when_empty(room_name, 'temperature'):
-                    self.log(f"🌡️ TEMPERATURE NORMALIZED! Fan auto-shutoff in {room_name}: temperature dropped to {temp_increase:.1f}°F above baseline")
+                if not self.should_keep_fan_on_when_empty(room_config, 'temperature'):
+                    self.log(f"{LOG_TEMPERATURE_NORMALIZED}{room_name}: temperature dropped to {temp_increase:.1f}°F above baseline")
                     self.turn_off_fans(room_config)
                     room_config['fan_active'] = False
                     room_config['fan_triggered_by'] = None
-                elif temp_increase < temp_threshold * 0.8:  # 80% of threshold
+                elif temp_increase < room_config['_temp_th_80'] and self._debug:  # 80% of threshold
                     self.log(f"Temperature decreasing in {room_name} ({temp_increase:.1f}°F above baseline) - fan will auto-shutoff when normalized")
 
             # Update baseline gradually when no spike and stable temperature
-            elif temp_increase < temp_threshold * 0.3 and abs(temp_change_rate) < 0.5:
+            elif temp_increase < room_config['_temp_th_30'] and abs(temp_change_rate) < 0.5:
                 # Slowly adjust baseline (moving average) only when temperature is stable
                 room_config['baseline_temperature'] = (baseline_temp * 0.98) + (current_temp * 0.02)
 
@@ -397,20 +616,25 @@ class RoomOccupancyManager(hass.Hass):
 
     def fan_state_changed(self, entity, attribute, old, new, kwargs):
         """Handle fan state changes to detect manual activation."""
-        room_name = kwargs["room_name"]
+        self._state_cache[entity] = new
+        if new == old:  # Attribute-only republish
+            return
+
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
         fan_entity = kwargs["fan_entity"]
-        room_config = self.rooms[room_name]
 
-        self.log(f"Fan state change detected: {fan_entity} from {old} to {new}")
+        if self._debug:
+            self.log(f"Fan state change detected: {fan_entity} from {old} to {new}")
 
         if new == "on" and old == "off":
             # Fan turned ON - determine if manual or automatic
-            if not room_config.get('fan_active', False):
+            if not room_config['fan_active']:
                 # System wasn't expecting fan to be on - this is MANUAL activation
                 self.log(f"🔧 MANUAL FAN ACTIVATION detected in {room_name} - fan will stay on until room is empty")
                 room_config['fan_active'] = True
                 room_config['fan_triggered_by'] = 'manual'
-            else:
+            elif self._debug:
                 # System was expecting fan to be on (automatic activation already tracked)
                 self.log(f"Automatic fan activation confirmed in {room_name}")
 
@@ -422,11 +646,10 @@ class RoomOccupancyManager(hass.Hass):
             if 'humidity_sensors' in room_config and room_config['humidity_sensors']:
                 current_humidity = room_config.get('last_humidity', 0)
                 baseline_humidity = room_config.get('baseline_humidity', 50.0)
-                humidity_threshold = room_config.get('humidity_threshold', 5.0)
                 humidity_increase = current_humidity - baseline_humidity
                 
-                if humidity_increase >= humidity_threshold:
-                    self.log(f"🌡️ Humidity elevated ({humidity_increase:.1f}%) - treating as AUTOMATIC trigger")
+                if humidity_increase >= room_config['_hum_th']:
+                    self.log(f"{LOG_HUMIDITY_ELEVATED}({humidity_increase:.1f}%) - treating as AUTOMATIC trigger")
                     room_config['fan_active'] = True
                     room_config['fan_triggered_by'] = 'humidity'
                     return
@@ -435,24 +658,23 @@ class RoomOccupancyManager(hass.Hass):
             if 'temperature_sensors' in room_config and room_config['temperature_sensors']:
                 current_temp = room_config.get('last_temperature', 20.0)
                 baseline_temp = room_config.get('baseline_temperature', 20.0)
-                temp_threshold = room_config.get('temperature_threshold', 3.0)
                 temp_increase = current_temp - baseline_temp
                 
-                if temp_increase >= temp_threshold:
-                    self.log(f"🌡️ Temperature elevated ({temp_increase:.1f}°F) - treating as AUTOMATIC trigger")
+                if temp_increase >= room_config['_temp_th']:
+                    self.log(f"{LOG_TEMPERATURE_ELEVATED}({temp_increase:.1f}°F) - treating as AUTOMATIC trigger")
                     room_config['fan_active'] = True
                     room_config['fan_triggered_by'] = 'temperature'
                     return
             
             # No elevated environmental conditions - assume manual
-            self.log(f"🔧 No environmental justification - treating as MANUAL activation")
+            self.log(LOG_NO_ENV_JUSTIFICATION)
             room_config['fan_active'] = True
             room_config['fan_triggered_by'] = 'manual'
 
         elif new == "off" and old == "on":
             # Fan turned OFF
-            if room_config.get('fan_active', False):
-                if room_config.get('fan_triggered_by') == 'manual':
+            if room_config['fan_active']:
+                if room_config['fan_triggered_by'] == 'manual':
                     self.log(f"🔧 MANUAL FAN DEACTIVATION detected in {room_name}")
                 else:
                     self.log(f"Automatic fan deactivation in {room_name}")
@@ -460,241 +682,298 @@ class RoomOccupancyManager(hass.Hass):
                 # Reset fan tracking
                 room_config['fan_active'] = False
                 room_config['fan_triggered_by'] = None
+    def timer_state_changed(self, entity, attribute, old, new, kwargs):
+        """Cache the room timer state and handle the timer going idle."""
+        self._timer_states[entity] = new
+        if new == "idle":
+            self.timer_finished(entity, attribute, old, new, kwargs)
+
     def timer_finished(self, entity, attribute, old, new, kwargs):
         """Handle when room timer finishes - FIXED to check occupancy properly."""
-        room_name = kwargs["room_name"]
-        room_config = self.rooms[room_name]
+        room_config = self.rooms[kwargs["room_name"]]
+        room_name = room_config['_name']
 
         self.log(f"Timer finished for {room_name} - checking if room is still occupied")
 
         # CRITICAL FIX: Check if room should still be considered occupied
-        if self.is_room_occupied(room_name):
+        if self.is_room_occupied(room_config):
             self.log(f"TIMER RESTART: Room {room_name} still appears occupied (motion sensor ON), restarting timer")
-            self.start_timer(room_name)
+            self.start_timer(room_config)
             return
 
         # Room is actually empty, turn off lights and fans
         self.log(f"Timer expired for {room_name} - room is confirmed empty, turning off lights/fans")
-        self.handle_occupancy_cleared(room_name)
+        self.handle_occupancy_cleared(room_config)
+
+    def queue_occupancy_detected(self, room_config):
+        """Coalesce bursts of occupancy events so a room runs handle_occupancy_detected() once per 200 ms."""
+        room_name = room_config['_name']
+        if room_name not in self._pending_occupancy:
+            self._pending_occupancy[room_name] = self.run_in(self._flush_room, 0.2, room_name=room_name)
 
-    def handle_occupancy_detected(self, room_name):
+    def _flush_room(self, kwargs):
+        """Run the coalesced occupancy detection for a room."""
+        room_name = kwargs["room_name"]
+        self._pending_occupancy.pop(room_name, None)
+        self.handle_occupancy_detected(self.rooms[room_name])
+
+    def flush_pending_occupancy(self, room_config):
+        """Apply a queued occupancy detection now so it can't land after the room has cleared."""
+        handle = self._pending_occupancy.pop(room_config['_name'], None)
+        if handle is not None:
+            # Any turn_on this queues is seen by the clear that follows (expected_state), which switches it back off
+            self.cancel_timer(handle)
+            self.handle_occupancy_detected(room_config)
+
+    def handle_occupancy_detected(self, room_config):
         """Handle when occupancy is detected in a room."""
-        room_config = self.rooms[room_name]
+        room_name = room_config['_name']
 
         # Check light override
-        light_override = room_config.get("light_override")
-        if light_override and self.get_state(light_override) == "on":
+        if self.is_light_override_on(room_config):
             self.log(f"Light override active for {room_name}, skipping automatic control")
             return
 
         room_config['occupancy_active'] = True
 
         # CRITICAL: Cancel any running timer when occupancy is detected
-        self.cancel_timer(room_name)
+        self.cancel_room_timer(room_config)
 
         # Different behavior for bathrooms vs other rooms
-        if self.is_bathroom(room_name):
+        if self.is_bathroom(room_config):
             # BATHROOM: NO AUTOMATIC LIGHT CONTROL
             self.log(f"Occupancy detected in {room_name} (bathroom) - no automatic light control")
         else:
             # NON-BATHROOM: Normal automatic light control
-            room_behavior = room_config.get("behavior", "normal")
+            room_behavior = room_config['_behavior']
 
             if room_behavior == "night_only":
                 if self.is_night_time():
                     self.turn_on_lights(room_config)
-                    self.log(f"Turned on lights in {room_name} (night time)")
+                    if self._debug:
+                        self.log(f"Turned on lights in {room_name} (night time)")
             elif room_behavior == "normal":
                 self.turn_on_lights(room_config)
-                self.log(f"Turned on lights in {room_name}")
+                if self._debug:
+                    self.log(f"Turned on lights in {room_name}")
 
         # DO NOT start timer here - timer should only start when occupancy clears!
         self.log(f"Occupancy active in {room_name} - timer will NOT start until occupancy clears")
 
-    def handle_occupancy_cleared(self, room_name):
+    def handle_occupancy_cleared(self, room_config):
         """Handle when room becomes unoccupied."""
-        room_config = self.rooms[room_name]
+        room_name = room_config['_name']
+        self.flush_pending_occupancy(room_config)
 
         # CRITICAL FIX: Double-check that room is actually empty BEFORE proceeding
-        if self.is_room_occupied(room_name):
+        if self.is_room_occupied(room_config):
             self.log(f"OCCUPANCY CHECK: Room {room_name} appears to still be occupied, not clearing")
             return
 
         self.log(f"Room {room_name} is now EMPTY - checking lights and fans")
 
+        # Lights and fans to switch off are collected and handled in a single pass below
+        kinds_off = []
+
         # Check light override
-        light_override = room_config.get("light_override")
-        if light_override and self.get_state(light_override) == "on":
+        if self.is_light_override_on(room_config):
             self.log(f"Light override active for {room_name}, not turning off lights")
         else:
             # TURN OFF LIGHTS for ALL room types when empty
             self.log(f"Turning off ALL lights in {room_name} - room is empty")
-            self.turn_off_lights(room_config)
+            kinds_off.append("light")
 
         # ENHANCED FAN LOGIC: Different behavior for manual vs automatic fans
-        if room_config.get('fan_active', False):
-            fan_trigger_source = room_config.get('fan_triggered_by', 'unknown')
+        if room_config['fan_active']:
+            fan_trigger_source = room_config['fan_triggered_by']
 
-            if fan_trigger_source == 'manual':
-                # MANUAL FAN: Turn off when room becomes empty (user wanted it on for bathroom use)
-                self.log(f"🔧 MANUAL FAN - Turning off fan in {room_name} because room is now empty")
-                self.turn_off_fans(room_config)
-                room_config['fan_active'] = False
-                room_config['fan_triggered_by'] = None
-            elif fan_trigger_source in ['humidity', 'temperature']:
-                # AUTOMATIC FAN: Only turn off if environmental conditions have normalized
-                if self.should_keep_fan_on_when_empty(room_name, fan_trigger_source):
-                    self.log(f"🌡️ AUTOMATIC FAN - Keeping fan on in {room_name} until environmental conditions normalize")
-                else:
-                    self.log(f"🌡️ AUTOMATIC FAN - Environmental conditions normalized, turning off fan in {room_name}")
-                    self.turn_off_fans(room_config)
-                    room_config['fan_active'] = False
-                    room_config['fan_triggered_by'] = None
+            # MANUAL FAN: Turn off when room becomes empty (user wanted it on for bathroom use)
+            # AUTOMATIC FAN: Only turn off if environmental conditions have normalized
+            # Unknown trigger source - default to turning off when empty
+            check_environment, off_message = FAN_POLICY.get(fan_trigger_source, FAN_POLICY_UNKNOWN)
+
+            if check_environment and self.should_keep_fan_on_when_empty(room_config, fan_trigger_source):
+                self.log(f"🌡️ AUTOMATIC FAN - Keeping fan on in {room_name} until environmental conditions normalize")
             else:
-                # Unknown trigger source - default to turning off when empty
-                self.log(f"⚠️ UNKNOWN FAN TRIGGER - Turning off fan in {room_name} (unknown source: {fan_trigger_source})")
-                self.turn_off_fans(room_config)
+                self.log(off_message.format(room=room_name, source=fan_trigger_source))
+                kinds_off.append("fan")
                 room_config['fan_active'] = False
                 room_config['fan_triggered_by'] = None
 
+        if kinds_off:
+            self.set_room_entities(room_config, kinds_off, "off")
+
         # Reset occupancy state
         room_config['occupancy_active'] = False
 
-    def should_keep_fan_on_when_empty(self, room_name, trigger_source):
+    def should_keep_fan_on_when_empty(self, room_config, trigger_source):
         """Check if automatic fan should stay on when room is empty due to environmental conditions."""
-        room_config = self.rooms[room_name]
-
         if trigger_source == 'humidity':
             # Check if humidity has dropped significantly below threshold
             current_humidity = room_config.get('last_humidity', 0)
             baseline_humidity = room_config.get('baseline_humidity', 50.0)
-            humidity_threshold = room_config.get('humidity_threshold', 5.0)
             humidity_increase = current_humidity - baseline_humidity
 
             # Keep fan on if humidity is still significantly elevated
-            normalized_threshold = humidity_threshold * 0.8  # 80% of original threshold
+            normalized_threshold = room_config['_hum_th_80']  # 80% of original threshold
             if humidity_increase >= normalized_threshold:
-                self.log(f"Humidity still elevated: {humidity_increase:.1f}% (threshold: {normalized_threshold:.1f}%)")
+                if self._debug:
+                    self.log(f"Humidity still elevated: {humidity_increase:.1f}% (threshold: {normalized_threshold:.1f}%)")
                 return True
 
         elif trigger_source == 'temperature':
             # Check if temperature has dropped significantly below threshold
             current_temp = room_config.get('last_temperature', 20.0)
             baseline_temp = room_config.get('baseline_temperature', 20.0)
-            temp_threshold = room_config.get('temperature_threshold', 3.0)
             temp_increase = current_temp - baseline_temp
 
             # Keep fan on if temperature is still significantly elevated
-            normalized_threshold = temp_threshold * 0.5  # 50% of original threshold
+            normalized_threshold = room_config['_temp_th_50']  # 50% of original threshold
             if temp_increase >= normalized_threshold:
-                self.log(f"Temperature still elevated: {temp_increase:.1f}°F (threshold: {normalized_threshold:.1f}°F)")
+                if self._debug:
+                    self.log(f"Temperature still elevated: {temp_increase:.1f}°F (threshold: {normalized_threshold:.1f}°F)")
                 return True
 
         # Environmental conditions have normalized
         return False
 
-    def is_room_occupied(self, room_name):
+    def is_room_occupied(self, room_config):
         """Check if room appears to still be occupied - ENHANCED LOGGING."""
-        room_config = self.rooms[room_name]
-
-        # Check presence sensors first (most accurate)
-        presence_sensors = room_config.get("presence_sensors", [])
-        for sensor in presence_sensors:
-            sensor_state = self.get_state(sensor)
-            if sensor_state == "on":
-                self.log(f"OCCUPANCY: Room {room_name} occupied - presence sensor {sensor} is {sensor_state}")
-                return True
-
-        # Check motion sensors - CRITICAL for timer restart logic
-        motion_sensors = room_config.get("motion_sensors", [])
-        for sensor in motion_sensors:
-            sensor_state = self.get_state(sensor)
-            if sensor_state == "on":
-                self.log(f"OCCUPANCY: Room {room_name} occupied - motion sensor {sensor} is {sensor_state}")
-                return True
-
-        # Check if doors are open (indicating potential occupancy)
-        doors = room_config.get("doors", [])
-        for door in doors:
-            door_state = self.get_state(door)
-            if door_state == "on":  # Door open
-                self.log(f"OCCUPANCY: Room {room_name} occupied - door sensor {door} is {door_state}")
-                return True
-
-        self.log(f"OCCUPANCY: Room {room_name} appears EMPTY - all sensors inactive")
+        room_name = room_config['_name']
+
+        # Presence/motion/door sensors currently ON - maintained by the sensor callbacks.
+        # Motion is CRITICAL for timer restart logic; open doors indicate potential occupancy.
+        active_sensors = room_config['_active_sensors']
+        if active_sensors:
+            if self._debug:
+                self.log(f"OCCUPANCY: Room {room_name} occupied - active sensors: {', '.join(sorted(active_sensors))}")
+            return True
+
+        if self._debug:
+            self.log(f"OCCUPANCY: Room {room_name} appears EMPTY - all sensors inactive")
         return False
 
-    def start_timer(self, room_name):
+    def start_timer(self, room_config):
         """Start timer ONLY if room is actually empty - CRITICAL SAFETY CHECK."""
-        room_config = self.rooms[room_name]
-        timer_entity = room_config.get("timer_entity")
+        room_name = room_config['_name']
+        timer_entity = room_config['_timer']
+        self.flush_pending_occupancy(room_config)
 
         if timer_entity:
             # CRITICAL: Never start timer if there's active occupancy
-            if self.is_room_occupied(room_name):
+            if self.is_room_occupied(room_config):
                 self.log(f"TIMER BLOCKED: Cannot start timer for {room_name} - occupancy detected!")
                 return
 
-            current_timer_state = self.get_state(timer_entity)
             self.call_service("timer/start", entity_id=timer_entity)
-            self.log(f"Timer for {room_name}: Started (was {current_timer_state}) - room confirmed empty")
+            self._timer_states[timer_entity] = "active"  # Don't wait for the state event to reflect our own start
+            self.log(f"Timer for {room_name}: Started - room confirmed empty")
 
-    def cancel_timer(self, room_name):
+    def cancel_room_timer(self, room_config):
         """Cancel the timer for a room if it's running."""
-        room_config = self.rooms[room_name]
-        timer_entity = room_config.get("timer_entity")
+        room_name = room_config['_name']
+        timer_entity = room_config['_timer']
 
         if timer_entity:
-            timer_state = self.get_state(timer_entity)
-            if timer_state == "active":
+            if self._timer_states.get(timer_entity) == "active":
                 self.call_service("timer/cancel", entity_id=timer_entity)
+                self._timer_states[timer_entity] = "idle"
                 self.log(f"Cancelled timer for {room_name} - occupancy detected")
 
     def turn_on_lights(self, room_config):
         """Turn on all lights in a room."""
-        lights = room_config.get("lights", [])
-        for light in lights:
-            current_state = self.get_state(light)
-            if current_state == "off":
-                self.turn_on(light)
-                self.log(f"Turned ON light: {light} (was {current_state})")
+        self.set_room_entities(room_config, ("light",), "on")
 
     def turn_off_lights(self, room_config):
         """Turn off all lights in a room - ENHANCED to handle all light types."""
-        lights = room_config.get("lights", [])
-        for light in lights:
-            current_state = self.get_state(light)
-            if current_state == "on":
-                self.turn_off(light)
-                self.log(f"Turned OFF light: {light} (was {current_state})")
-            elif current_state is None:
-                self.log(f"WARNING: Light entity {light} not found or unavailable", level="WARNING")
+        self.set_room_entities(room_config, ("light",), "off")
 
     def turn_on_fans(self, room_config):
         """Turn on all fans in a room."""
-        fans = room_config.get("fans", [])
-        for fan in fans:
-            current_state = self.get_state(fan)
-            if current_state == "off":
-                self.turn_on(fan)
-                self.log(f"💨 Turned ON fan: {fan} (was {current_state})")
+        self.set_room_entities(room_config, ("fan",), "on")
 
     def turn_off_fans(self, room_config):
         """Turn off all fans in a room."""
-        fans = room_config.get("fans", [])
-        for fan in fans:
-            current_state = self.get_state(fan)
-            if current_state == "on":
-                self.turn_off(fan)
-                self.log(f"🔇 Turned OFF fan: {fan} (was {current_state})")
+        self.set_room_entities(room_config, ("fan",), "off")
+
+    def set_room_entities(self, room_config, kinds, target_state):
+        """Switch the room's entities of the given kinds ("light"/"fan") to target_state in one pass."""
+        action = "turn_on" if target_state == "on" else "turn_off"
+        from_state = "off" if target_state == "on" else "on"
+
+        # Local alias avoids an attribute lookup per entity; while calls are queued, decide on the state they will produce
+        cache_get = self.expected_state if self._svc_queue else self._state_cache.get
+        selected = [(entity, kind, cache_get(entity)) for entity, kind in room_config['_entities'] if kind in kinds]
+        to_switch = [entity for entity, _, current_state in selected if current_state == from_state]
+
+        if self._debug:
+            for entity, kind, current_state in selected:
+                if current_state == from_state:
+                    self.log(f"{ENTITY_SWITCH_LOG[(kind, target_state)]}: {entity} (was {current_state})")
+
+        if to_switch:
+            self._enqueue_svc(action, to_switch)
+            self.log(f"Turned {target_state.upper()} in {room_config['_name']}: {', '.join(to_switch)}")
+
+    def expected_state(self, entity):
+        """Return the state a queued service call will leave the entity in, else its last confirmed state."""
+        domain = entity.split(".", 1)[0]
+        if entity in self._svc_queue.get(f"{domain}/turn_on", ()):
+            return "on"
+        if entity in self._svc_queue.get(f"{domain}/turn_off", ()):
+            return "off"
+        return self._state_cache.get(entity)
+
+    def _enqueue_svc(self, action, entities):
+        """Queue turn_on/turn_off for entities grouped by domain; calls across rooms are batched into one flush."""
+        opposite = "turn_off" if action == "turn_on" else "turn_on"
+
+        by_domain = defaultdict(list)
+        for entity in entities:
+            by_domain[entity.split(".", 1)[0]].append(entity)
+
+        for domain, domain_entities in by_domain.items():
+            # Latest request for an entity wins if both actions land in the same window
+            self._svc_queue[f"{domain}/{opposite}"].difference_update(domain_entities)
+            self._svc_queue[f"{domain}/{action}"].update(domain_entities)
+
+        if self._svc_handle is None:
+            self._svc_handle = self.run_in(self._flush_svc, 0.1)
+
+    def _flush_svc(self, kwargs):
+        """Issue one service call per queued service with all of its entities."""
+        queue = self._svc_queue
+        self._svc_queue = defaultdict(set)
+        self._svc_handle = None
+
+        for service, entities in queue.items():
+            if entities:
+                self.call_service(service, entity_id=sorted(entities))
 
     def is_night_time(self):
         """Check if it's currently night time."""
+        tick = time.monotonic()
+        if tick < self._night_ttl_until:
+            return self._night_val
+
         try:
-            current_time = datetime.now().time()
-            sunrise_time = self.sunrise().time()
-            sunset_time = self.sunset().time()
-            return current_time >= sunset_time or current_time <= sunrise_time
-        except Exception as e:
+            now = datetime.now()
+            today = now.date()
+            if self._sun_cache_date != today:
+                sunrise_time = self.sunrise().time()
+                sunset_time = self.sunset().time()
+                # Seconds since midnight - plain int comparisons on the hot path
+                self._sun_cache = (
+                    sunrise_time.hour * 3600 + sunrise_time.minute * 60 + sunrise_time.second,
+                    sunset_time.hour * 3600 + sunset_time.minute * 60 + sunset_time.second,
+                )
+                self._sun_cache_date = today
+
+            sunrise_s, sunset_s = self._sun_cache
+            now_s = now.hour * 3600 + now.minute * 60 + now.second
+            self._night_val = now_s >= sunset_s or now_s <= sunrise_s
+            self._night_ttl_until = tick + 30
+            return self._night_val
+        except (AttributeError, ValueError) as e:
             self.log(f"Error checking night time: {e}", level="WARNING")
             return False
\ No newline at end of file